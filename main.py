@@ -4,36 +4,119 @@ import html
 import os
 import datetime
 import base64
-import json
+import hashlib
 import time
 import re
 import markdown
 import argparse
+import random
+import functools
+import importlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from email import message_from_bytes
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from email.message import EmailMessage
 from email.header import decode_header
 from email.utils import formataddr
 
-import google.generativeai as genai
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import feedparser
-from difflib import SequenceMatcher
+import orjson
 
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from google.api_core.exceptions import ResourceExhausted
 from google.cloud import secretmanager
-from google.cloud import storage
-import vertexai
-from vertexai.vision_models import ImageGenerationModel, Image
+# google.generativeai, vertexai and google.cloud.storage are slow to import and only needed on one code path each,
+# so they are imported where they are used instead of at startup.
 
 # --- CONFIGURATION & CONSTANTS ---
 SCOPES = ["https://www.googleapis.com/auth/gmail.send", "https://www.googleapis.com/auth/gmail.modify", "https://www.googleapis.com/auth/calendar.readonly", "https://www.googleapis.com/auth/documents"]
+FEED_CACHE_PATH = "/tmp/feed_cache.json"
+TOKEN_CACHE_PATH = "/tmp/token.json"
+DISK_CACHE_DIR = "/tmp"
+# RAWG and YouTube responses are reused for a day so same-day re-runs don't repeat the API calls.
+API_CACHE_TTL_SECONDS = 24 * 60 * 60
+TITLE_WORD_RE = re.compile(r'\w+')
+# Matches one '## Title' section of the AI report, ending at a '---' separator, the next '## ' heading, or the end of the text.
+# Headings may be indented, since the prompt itself is indented and the model sometimes copies that.
+SECTION_RE = re.compile(r'^[ \t]*##(?!#)[ \t]*(?P<title>[^\n]+)\n(?P<body>.*?)(?=^[ \t]*-{3,}[ \t]*$|^[ \t]*##(?!#)|\Z)', re.S | re.M)
+# Punctuation and Markdown emphasis, ignored when comparing section titles.
+SECTION_TITLE_NOISE_RE = re.compile(r'[^\w\s]|_')
+# Reused for every section; call MD.reset() before each convert().
+MD = markdown.Markdown(extensions=['extra'])
+
+# '## ' section titles in the order the prompt asks for them.
+REPORT_SECTIONS = [
+    "Hero Image Prompt Generation",
+    "This Week's Key Takeaways",
+    "Top Stories & Market Analysis (The Signal)",
+    "Funding & Investment Tracker (The Signal)",
+    "Community Pulse & Player Reception (The Noise)",
+    "Insights for Developers",
+    "Technology, Hardware and Tools Updates",
+    "New Game Announcements",
+    "Upcoming Releases (Next 30 days)",
+    "Tentpole Releases (1+ Months)",
+]
+# (Email heading, AI report section title) in the order the sections appear in the email.
+EMAIL_SECTIONS = [
+    ("This Week's Key Takeaways", "This Week's Key Takeaways"),
+    ("Top Stories & Market Analysis (The Signal)", "Top Stories & Market Analysis (The Signal)"),
+    ("Funding & Investment Tracker (The Signal)", "Funding & Investment Tracker (The Signal)"),
+    ("Community Pulse & Player Reception", "Community Pulse & Player Reception (The Noise)"),
+    ("Insights for Developers", "Insights for Developers"),
+    ("Technology, Hardware and Tools Updates", "Technology, Hardware and Tools Updates"),
+    ("New Game Announcements", "New Game Announcements"),
+    ("Upcoming Releases (Next 30 days)", "Upcoming Releases (Next 30 days)"),
+    ("Tentpole Releases (1+ Months)", "Tentpole Releases (1+ Months)"),
+]
+EMAIL_HTML_HEAD = """<html><head><style>
+    body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: auto; padding: 20px; }
+    h1, h2, h3 { font-weight: 500; color: #111; } h1 { font-size: 24px; }
+    h2 { font-size: 20px; border-bottom: 1px solid #eee; padding-bottom: 5px; margin-top: 30px; }
+    h3 {font-size: 16px;}
+</style></head><body>"""
+EMAIL_HTML_TAIL = "</body></html>"
+
+# Shared HTTP session for all outbound HTTP (feeds, Reddit, RAWG) so repeated calls to the same host reuse pooled connections.
+# pool_connections is the number of per-host pools kept, so it has to cover the ~30 distinct feed and API hosts.
+SESSION = requests.Session()
+HTTP_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]))
+SESSION.mount("https://", HTTP_ADAPTER)
+SESSION.mount("http://", HTTP_ADAPTER)
+
+_feed_cache = None
+_feed_cache_lock = threading.Lock()
+# Feed URL -> Future for downloads currently in flight, so concurrent requests for the same feed share one download.
+_inflight_feeds = {}
+_inflight_feeds_lock = threading.Lock()
+
+@dataclass(slots=True, frozen=True)
+class ReportConfig:
+    """
+    Per-run settings and clients, built once in __main__ and passed to run_weekly_games_report.
+    """
+    project_id: str
+    youtube_api_key: str | None
+    rawg_api_key: str | None
+    recipient_email: str | None
+    genai_model: object
+    creds: Credentials
 
 # --- UNIVERSAL HELPER & AUTH FUNCTIONS ---
+@functools.lru_cache(maxsize=None)
+def get_secret_client():
+    # Creating the client sets up a gRPC channel and resolves credentials, so do it once per process.
+    return secretmanager.SecretManagerServiceClient()
+
+@functools.lru_cache(maxsize=None)
 def get_secret(secret_id, project_id, version="latest"):
-    client = secretmanager.SecretManagerServiceClient()
+    client = get_secret_client()
     name = f"projects/{project_id}/secrets/{secret_id}/versions/{version}"
     try:
         response = client.access_secret_version(request={"name": name})
@@ -42,28 +125,135 @@ def get_secret(secret_id, project_id, version="latest"):
         print(f"Could not fetch secret: {secret_id}. Error: {e}")
         return None
 
-def send_email(service, subject, html_body, recipient_email):
+def parallel_map(fn, items, workers=8):
+    """
+    Applies fn to every item on a thread pool and returns the results in input order.
+    Intended for IO-bound calls; fn should handle its own errors.
+    """
+    items = list(items)
+    if not items: return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(fn, items))
+
+def read_disk_cache(cache_key, max_age_seconds):
+    """
+    Returns the JSON value cached under cache_key if it is younger than max_age_seconds, otherwise None.
+    """
+    cache_path = os.path.join(DISK_CACHE_DIR, f"{cache_key}.json")
+    try:
+        if time.time() - os.path.getmtime(cache_path) < max_age_seconds:
+            with open(cache_path, "rb") as f:
+                return orjson.loads(f.read())
+    except (OSError, ValueError):
+        pass
+    return None
+
+def write_disk_cache(cache_key, value):
+    cache_path = os.path.join(DISK_CACHE_DIR, f"{cache_key}.json")
+    try:
+        with open(cache_path, "wb") as f:
+            f.write(orjson.dumps(value))
+    except OSError as e:
+        print(f"Could not write cache file {cache_path}. Error: {e}")
+
+def load_credentials(token_json):
+    """
+    Loads the Gmail OAuth credentials, preferring a still-valid access token saved by an earlier run on this
+    instance so the token refresh round-trip can be skipped.
+    """
+    try:
+        creds = Credentials.from_authorized_user_file(TOKEN_CACHE_PATH, SCOPES)
+        if creds.valid: return creds
+    except (OSError, ValueError):
+        pass
+    return Credentials.from_authorized_user_info(orjson.loads(token_json), SCOPES)
+
+def save_credentials(creds):
+    if not creds.token: return
+    try:
+        # Owner-only permissions, since the file holds a refresh token.
+        with os.fdopen(os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            f.write(creds.to_json())
+    except OSError as e:
+        print(f"Could not save refreshed credentials to {TOKEN_CACHE_PATH}. Error: {e}")
+
+def get_sender_email(service):
+    profile = service.users().getProfile(userId='me').execute()
+    return profile['emailAddress']
+
+def send_email(service, subject, html_body, recipient_email, sender_email=None):
     print("Creating and sending email...")
     try:
-        profile = service.users().getProfile(userId='me').execute()
-        sender_email = profile['emailAddress']
+        if not sender_email: sender_email = get_sender_email(service)
         to_addresses = {sender_email.lower()}
         if recipient_email:
             additional_recipients = recipient_email.split(',')
             for email in additional_recipients:
                 clean_email = email.strip().lower()
                 if clean_email: to_addresses.add(clean_email)
-        message = MIMEMultipart("alternative")
+        message = EmailMessage()
         message["To"] = ", ".join(sorted(list(to_addresses)))
         message["From"] = formataddr(("Your Automated Report", sender_email))
         message["Subject"] = subject
-        message.attach(MIMEText(html_body, "html"))
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
+        message.set_content(html_body, subtype="html")
+        raw_message = base64.urlsafe_b64encode(bytes(message)).decode()
         sent_message = service.users().messages().send(userId='me', body={'raw': raw_message}).execute()
         print(f"Successfully sent email! Message ID: {sent_message['id']}")
     except HttpError as error:
         print(f"An error occurred while sending the email: {error}")
         
+def normalize_section_title(title):
+    # Ignores case, punctuation, emphasis and spacing, so "**this week's key takeaways**" matches "This Week's Key Takeaways".
+    return " ".join(SECTION_TITLE_NOISE_RE.sub(" ", title.casefold()).split())
+
+def split_report_sections(report_text, complete_only=False):
+    """
+    Splits the AI report into a dictionary of section title to Markdown body, keyed by the titles in REPORT_SECTIONS.
+    '## ' headings are matched to titles after normalize_section_title; a heading that still doesn't match is
+    assigned by position, if the title expected at that position hasn't been found.
+    With complete_only, the last section is left out because it may still be streaming in, and only headings
+    matched by name are returned.
+    """
+    matches = list(SECTION_RE.finditer(report_text))
+    if complete_only: matches = matches[:-1]
+    titles_by_key = {normalize_section_title(title): title for title in REPORT_SECTIONS}
+    sections = {}
+    unmatched = []
+    for position, match in enumerate(matches):
+        title = titles_by_key.get(normalize_section_title(match.group('title')))
+        if title and title not in sections: sections[title] = match.group('body').strip()
+        else: unmatched.append((position, match))
+    # Later headings can still claim a title by name while streaming, so only fall back to position on the full report.
+    if complete_only: return sections
+    for position, match in unmatched:
+        if position < len(REPORT_SECTIONS) and REPORT_SECTIONS[position] not in sections:
+            sections[REPORT_SECTIONS[position]] = match.group('body').strip()
+    return sections
+
+def find_mentioned_games(games, text):
+    """
+    Returns the games whose exact name appears in the text, in list order.
+    All names are matched in a single regex scan, longest first, so a name that is only part of a longer mentioned title does not count.
+    """
+    names = sorted({game['name'] for game in games if game['name']}, key=len, reverse=True)
+    if not names or not text: return []
+    mentioned = set(re.findall("|".join(map(re.escape, names)), text))
+    return [game for game in games if game['name'] in mentioned]
+
+def generate_content_with_backoff(genai_model, prompt, max_attempts=4, **kwargs):
+    """
+    Calls generate_content, retrying with jittered exponential backoff when Gemini returns 429 (quota exhausted).
+    With stream=True the quota error is raised before the first chunk is returned, so a retry never repeats output.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return genai_model.generate_content(prompt, **kwargs)
+        except ResourceExhausted as e:
+            if attempt == max_attempts - 1: raise
+            delay = 2 ** (attempt + 1) + random.random()
+            print(f"Gemini quota exhausted, retrying in {delay:.1f}s. Error: {e}")
+            time.sleep(delay)
+
 def format_sources_for_email(sources_map):
     """
     Takes a dictionary of sources and formats them into a Markdown string for the email footer.
@@ -94,6 +284,11 @@ def generate_hero_image(project_id, location, gcs_bucket_name, prompt_text):
     """
     print("--- Starting Hero Image Generation using Vertex AI SDK ---")
     try:
+        # Imported here so the import runs on the hero image thread, overlapping the Gemini stream.
+        import vertexai
+        from vertexai.vision_models import ImageGenerationModel
+        from google.cloud import storage
+
         vertexai.init(project=project_id, location=location)
 
         image_prompt = (
@@ -111,8 +306,7 @@ def generate_hero_image(project_id, location, gcs_bucket_name, prompt_text):
             negative_prompt="text, words, blurry, low quality, watermark, person, character"
         )
         
-        temp_filename = "/tmp/hero_image.png"
-        response[0].save(location=temp_filename)
+        image_bytes = response[0]._image_bytes
         print("Successfully generated image.")
 
         storage_client = storage.Client()
@@ -120,8 +314,8 @@ def generate_hero_image(project_id, location, gcs_bucket_name, prompt_text):
         destination_blob_name = f"hero-{int(time.time())}.png"
         blob = bucket.blob(destination_blob_name)
 
-        blob.upload_from_filename(temp_filename)
-        blob.make_public()
+        # Upload straight from memory and set the public-read ACL in the same request instead of a separate make_public() call.
+        blob.upload_from_string(image_bytes, content_type="image/png", predefined_acl="publicRead")
         
         print(f"Image uploaded to GCS. Public URL: {blob.public_url}")
         return blob.public_url
@@ -131,104 +325,289 @@ def generate_hero_image(project_id, location, gcs_bucket_name, prompt_text):
         return "https://storage.googleapis.com/gemini-generative-ai-python-static/placeholder.png"
 
 
-def deduplicate_articles(articles, threshold=0.7):
+def title_tokens(title):
+    """
+    Returns the set of lowercase words in a title, used as its fingerprint for deduplication.
+    """
+    return frozenset(TITLE_WORD_RE.findall(title.lower()))
+
+def deduplicate_articles(articles, threshold=0.55):
     """
     Filters a list of article dictionaries, removing those with titles similar to already accepted articles.
+    Similarity is the Jaccard overlap of the titles' word sets, and a title at or above threshold is a duplicate.
+    Accepted titles are kept in an inverted word index, so the overlap with every accepted title sharing a word
+    is counted in one linear pass.
     """
     unique_articles = []
+    unique_tokens = []
+    token_index = {}
     print(f"Deduplicating {len(articles)} articles...")
     
     for article in articles:
+        tokens = title_tokens(article['title'])
+        overlap = {}
+        for token in tokens:
+            for idx in token_index.get(token, ()):
+                overlap[idx] = overlap.get(idx, 0) + 1
+
         is_duplicate = False
-        for unique in unique_articles:
-            similarity = SequenceMatcher(None, article['title'], unique['title']).ratio()
-            if similarity > threshold:
-                print(f"Duplicate found (Similarity: {similarity:.2f}):\n  - New: {article['title']}\n  - Existing: {unique['title']}")
+        for idx in sorted(overlap):
+            shared = overlap[idx]
+            similarity = shared / (len(tokens) + len(unique_tokens[idx]) - shared)
+            if similarity >= threshold:
+                print(f"Duplicate found (Similarity: {similarity:.2f}):\n  - New: {article['title']}\n  - Existing: {unique_articles[idx]['title']}")
                 is_duplicate = True
                 break
         
         if not is_duplicate:
+            for token in tokens:
+                token_index.setdefault(token, []).append(len(unique_articles))
+            unique_tokens.append(tokens)
             unique_articles.append(article)
             
     print(f"Reduced from {len(articles)} to {len(unique_articles)} articles.")
     return unique_articles
 
+def deduplicate_article_groups(article_groups, threshold=0.55):
+    """
+    Deduplicates several article lists in one pass so a story syndicated into more than one group only appears once.
+    article_groups maps group name to articles in priority order; a duplicate is kept in the earliest group it appears in.
+    """
+    pooled = [{"title": article['title'], "group": group, "article": article} for group, articles in article_groups.items() for article in articles]
+    deduplicated = {group: [] for group in article_groups}
+    for entry in deduplicate_articles(pooled, threshold=threshold):
+        deduplicated[entry['group']].append(entry['article'])
+    return deduplicated
+
 # --- ### WEEKLY RSS/API FUNCTIONS ### ---
 
+def _get_feed_cache():
+    global _feed_cache
+    if _feed_cache is None:
+        try:
+            with open(FEED_CACHE_PATH, "rb") as f:
+                _feed_cache = orjson.loads(f.read())
+        except (OSError, ValueError):
+            _feed_cache = {}
+    return _feed_cache
+
+def get_cached_feed(url):
+    with _feed_cache_lock:
+        return _get_feed_cache().get(url, {})
+
+def store_cached_feed(url, etag, modified, articles):
+    with _feed_cache_lock:
+        _get_feed_cache()[url] = {"etag": etag, "modified": modified, "articles": articles}
+
+def save_feed_cache():
+    """
+    Persists the ETag/Last-Modified validators and parsed articles so the next run can make conditional requests.
+    """
+    with _feed_cache_lock:
+        if _feed_cache is None: return
+        try:
+            with open(FEED_CACHE_PATH, "wb") as f:
+                f.write(orjson.dumps(_feed_cache))
+        except OSError as e:
+            print(f"Could not save feed cache to {FEED_CACHE_PATH}. Error: {e}")
+
+def fetch_single_rss_feed(url):
+    """
+    Fetches one RSS feed, joining an identical download already in flight (e.g. a feed listed in two groups)
+    instead of starting a second one.
+    """
+    with _inflight_feeds_lock:
+        future = _inflight_feeds.get(url)
+        is_owner = future is None
+        if is_owner:
+            future = _inflight_feeds[url] = Future()
+    if not is_owner:
+        print(f"Joining in-flight download of {url}")
+        return future.result()
+
+    try:
+        articles = download_rss_feed(url)
+        future.set_result(articles)
+        return articles
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_feeds_lock:
+            _inflight_feeds.pop(url, None)
+
+def download_rss_feed(url):
+    """
+    Downloads one RSS feed and returns its latest entries as a list of dictionaries, including a potential image URL.
+    Sends the cached ETag/Last-Modified validators, and reuses the cached articles when the server answers 304.
+    """
+    articles = []
+    try:
+        cached = get_cached_feed(url)
+        headers = {'User-agent': 'Python Weekly Games Report Bot v1.0'}
+        if cached.get('etag'): headers['If-None-Match'] = cached['etag']
+        if cached.get('modified'): headers['If-Modified-Since'] = cached['modified']
+        # Download through the shared session (pooled connections, retries, timeout) and let feedparser only parse.
+        response = SESSION.get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and 'articles' in cached:
+            print(f"Feed not modified, reusing {len(cached['articles'])} cached articles from {url}")
+            return cached['articles']
+        response.raise_for_status()
+        # feedparser looks headers up by lowercase name (e.g. 'content-type' for the charset), so pass a plain lowercased dict.
+        feed = feedparser.parse(response.content, response_headers={k.lower(): v for k, v in response.headers.items()})
+        if feed.entries:
+            print(f"Successfully fetched {len(feed.entries)} articles from {url}")
+            for entry in feed.entries[:7]:
+                image_url = ""
+                if 'media_content' in entry and entry.media_content:
+                    image_url = entry.media_content[0].get('url', '')
+                elif 'enclosures' in entry and entry.enclosures:
+                    image_url = entry.enclosures[0].get('href', '')
+                
+                articles.append({
+                    "title": entry.title,
+                    "summary": entry.get('summary', 'No summary available.'),
+                    "source": feed.feed.title,
+                    "image_url": image_url
+                })
+            etag, modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+            if etag or modified:
+                store_cached_feed(url, etag, modified, articles)
+    except Exception as e:
+        print(f"Could not parse feed from {url}. Error: {e}")
+    return articles
+
 def fetch_rss_feed_for_weekly(feed_urls):
     """
-    MODIFIED: Now returns a list of dictionaries, including a potential image URL.
+    MODIFIED: Fetches all feeds concurrently and returns a combined list of article dictionaries in feed order.
     """
     print(f"Fetching weekly RSS feeds from: {feed_urls}")
     all_articles = []
-    for url in feed_urls:
-        try:
-            feed = feedparser.parse(url, agent='Python Weekly Games Report Bot v1.0')
-            if feed.entries:
-                print(f"Successfully fetched {len(feed.entries)} articles from {url}")
-                for entry in feed.entries[:7]:
-                    image_url = ""
-                    if 'media_content' in entry and entry.media_content:
-                        image_url = entry.media_content[0].get('url', '')
-                    elif 'enclosures' in entry and entry.enclosures:
-                        image_url = entry.enclosures[0].get('href', '')
-                    
-                    all_articles.append({
-                        "title": entry.title,
-                        "summary": entry.get('summary', 'No summary available.'),
-                        "source": feed.feed.title,
-                        "image_url": image_url
-                    })
-        except Exception as e:
-            print(f"Could not parse feed from {url}. Error: {e}")
+    for articles in parallel_map(fetch_single_rss_feed, feed_urls):
+        all_articles.extend(articles)
     return all_articles
 
-def fetch_youtube_channel_videos(api_key, channel_id):
+def fetch_youtube_channel_videos(api_key, channel_ids):
     """
-    MODIFIED: Fetches recent videos and returns a list of dictionaries with title, description, and thumbnail URL.
+    MODIFIED: Fetches recent videos for all channels in a single batched API request and returns a list of
+    dictionaries with title, description, and thumbnail URL, in channel order. Complete results are cached for a day.
     """
-    print(f"Fetching recent videos from YouTube channel: {channel_id}")
+    print(f"Fetching recent videos from YouTube channels: {channel_ids}")
     if not api_key: return [] # Return an empty list on error
+    cache_key = f"youtube_{hashlib.md5(','.join(channel_ids).encode()).hexdigest()}"
+    video_list = read_disk_cache(cache_key, API_CACHE_TTL_SECONDS)
+    if video_list is not None:
+        print("Using cached YouTube videos.")
+        return video_list
     try:
         youtube = build('youtube', 'v3', developerKey=api_key)
         one_week_ago = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=7)).isoformat()
-        request = youtube.search().list(part="snippet", channelId=channel_id, maxResults=5, order="date", publishedAfter=one_week_ago, type="video")
-        response = request.execute()
-        videos = response.get("items", [])
+        responses = {}
+
+        def collect_response(request_id, response, exception):
+            if exception is not None:
+                print(f"Could not fetch YouTube videos for channel {request_id}: {exception}")
+            else:
+                responses[request_id] = response
+
+        batch = youtube.new_batch_http_request(callback=collect_response)
+        for channel_id in channel_ids:
+            batch.add(youtube.search().list(part="snippet", channelId=channel_id, maxResults=5, order="date", publishedAfter=one_week_ago, type="video"), request_id=channel_id)
+        batch.execute()
         
         video_list = []
-        for item in videos:
-            video_list.append({
-                "title": item['snippet']['title'],
-                "description": item['snippet']['description'],
-                "image_url": item['snippet']['thumbnails']['high']['url'],
-                "video_url": f"https://www.youtube.com/watch?v={item['id']['videoId']}"
-            })
-        if not video_list: print(f"No new videos found on channel {channel_id} in the last week.")
+        for channel_id in channel_ids:
+            videos = responses.get(channel_id, {}).get("items", [])
+            if not videos and channel_id in responses: print(f"No new videos found on channel {channel_id} in the last week.")
+            for item in videos:
+                video_list.append({
+                    "title": item['snippet']['title'],
+                    "description": item['snippet']['description'],
+                    "image_url": item['snippet']['thumbnails']['high']['url'],
+                    "video_url": f"https://www.youtube.com/watch?v={item['id']['videoId']}"
+                })
+        if len(responses) == len(channel_ids): write_disk_cache(cache_key, video_list)
         return video_list
     except Exception as e:
         print(f"Could not fetch YouTube videos: {e}")
         return [] # Return an empty list on error
 
-def fetch_reddit_hot_posts(subreddits):
+def fetch_subreddit_listing(subreddit_path, limit):
+    url = f"https://www.reddit.com/r/{subreddit_path}/hot.json?limit={limit}"
+    response = SESSION.get(url, headers={'User-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'}, timeout=10)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    return data['data']['children']
+
+def fetch_subreddit_hot_posts(subreddit, limit=5):
+    try:
+        return fetch_subreddit_listing(subreddit, limit)
+    except Exception as e:
+         print(f"Could not fetch hot posts from r/{subreddit}. Error: {e}")
+         return []
+
+def fetch_reddit_hot_posts(subreddits, posts_per_subreddit=5):
+    """
+    Fetches hot posts for all subreddits with a single combined r/sub1+sub2 listing and groups them back per subreddit.
+    Quieter subreddits can be crowded out of the combined listing, so any that got fewer than posts_per_subreddit
+    posts are topped up from their own listing.
+    """
     print(f"Fetching hot Reddit posts from: {subreddits}")
+    subreddits = [subreddit.strip() for subreddit in subreddits]
+    posts_by_subreddit = {subreddit.lower(): [] for subreddit in subreddits}
+    try:
+        for post in fetch_subreddit_listing("+".join(subreddits), limit=100):
+            posts = posts_by_subreddit.get(post['data']['subreddit'].lower())
+            if posts is not None and len(posts) < posts_per_subreddit:
+                posts.append(post)
+    except Exception as e:
+        print(f"Could not fetch combined hot posts listing. Error: {e}")
+
+    short = [subreddit for subreddit in subreddits if len(posts_by_subreddit[subreddit.lower()]) < posts_per_subreddit]
+    fetch_own_listing = functools.partial(fetch_subreddit_hot_posts, limit=posts_per_subreddit)
+    for subreddit, posts in zip(short, parallel_map(fetch_own_listing, short)):
+        if len(posts) > len(posts_by_subreddit[subreddit.lower()]):
+            posts_by_subreddit[subreddit.lower()] = posts
+        if len(posts_by_subreddit[subreddit.lower()]) < posts_per_subreddit:
+            print(f"Only got {len(posts_by_subreddit[subreddit.lower()])} of {posts_per_subreddit} hot posts from r/{subreddit}.")
+
     all_posts = []
     for subreddit in subreddits:
-        subreddit = subreddit.strip()
-        url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=5"
-        try:
-            response = requests.get(url, headers={'User-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'})
-            response.raise_for_status()
-            data = response.json()
-            posts = data['data']['children']
-            if posts:
-                all_posts.append(f"--- Subreddit: r/{subreddit} ---")
-                for post in posts:
-                    all_posts.append(f"Title: {post['data']['title']}\nScore: {post['data']['score']}")
-        except Exception as e:
-             print(f"Could not fetch hot posts from r/{subreddit}. Error: {e}")
+        posts = posts_by_subreddit[subreddit.lower()]
+        if posts:
+            all_posts.append(f"--- Subreddit: r/{subreddit} ---")
+            all_posts.extend(f"Title: {post['data']['title']}\nScore: {post['data']['score']}" for post in posts)
     return "\n\n".join(all_posts) if all_posts else "Could not fetch any Reddit posts."
 
+def fetch_rawg_games(url):
+    """
+    Returns the 'results' list for a RAWG query, reusing a cached copy from the last 24 hours when available.
+    The URL already encodes the endpoint, date window and ordering, so its hash is the cache key.
+    """
+    cache_key = f"rawg_{hashlib.md5(url.encode()).hexdigest()}"
+    games = read_disk_cache(cache_key, API_CACHE_TTL_SECONDS)
+    if games is not None:
+        print("Using cached RAWG.io response.")
+        return games
+
+    response = SESSION.get(url, headers={'User-agent': 'Python Weekly Games Report Bot v1.0'}, timeout=10)
+    response.raise_for_status()
+    games = orjson.loads(response.content).get("results") or []
+    write_disk_cache(cache_key, games)
+    return games
+
+def summarize_rawg_game(game):
+    """
+    Extracts the fields used by the report from a RAWG game result, skipping missing platform and genre names.
+    """
+    return {
+        "name": game.get('name', 'Unknown Game'),
+        "release_date": game.get('released', 'Unknown Date'),
+        "platforms": ", ".join(name for p in game.get('platforms') or () if (name := (p.get('platform') or {}).get('name'))),
+        "genres": ", ".join(name for g in game.get('genres') or () if (name := g.get('name'))),
+        "image_url": game.get('background_image', '')
+    }
+
 def fetch_upcoming_releases_from_rawg(api_key):
     """
     MODIFIED: Now fetches upcoming games and returns a list of dictionaries including image URLs.
@@ -243,27 +622,13 @@ def fetch_upcoming_releases_from_rawg(api_key):
         dates_query = f"{today.strftime('%Y-%m-%d')},{end_date.strftime('%Y-%m-%d')}"
         url = f"https://api.rawg.io/api/games?key={api_key}&dates={dates_query}&ordering=released"
         
-        response = requests.get(url, headers={'User-agent': 'Python Weekly Games Report Bot v1.0'})
-        response.raise_for_status()
-        data = response.json()
-        games = data.get("results", [])
+        games = fetch_rawg_games(url)
         
         if not games:
             print("No upcoming game releases found on RAWG.io for the next 4 weeks.")
             return []
             
-        game_list = []
-        for game in games:
-            platforms = [p.get('platform', {}).get('name', '') for p in game.get('platforms') or []]
-            genres = [g.get('name', '') for g in game.get('genres') or []]
-            game_list.append({
-                "name": game.get('name', 'Unknown Game'),
-                "release_date": game.get('released', 'Unknown Date'),
-                "platforms": ", ".join(filter(None, platforms)),
-                "genres": ", ".join(filter(None, genres)),
-                "image_url": game.get('background_image', '')
-            })
-        return game_list
+        return [summarize_rawg_game(game) for game in games]
 
     except Exception as e:
         print(f"An error occurred while processing upcoming game releases: {e}")
@@ -283,27 +648,13 @@ def fetch_tentpole_releases_from_rawg(api_key, start_days, end_days):
         dates_query = f"{start_date.strftime('%Y-%m-%d')},{end_date.strftime('%Y-%m-%d')}"
         url = f"https://api.rawg.io/api/games?key={api_key}&dates={dates_query}&ordering=-added"
         
-        response = requests.get(url, headers={'User-agent': 'Python Weekly Games Report Bot v1.0'})
-        response.raise_for_status()
-        data = response.json()
-        games = data.get("results", [])
+        games = fetch_rawg_games(url)
         
         if not games:
             print(f"No major releases found on RAWG.io between {start_days} and {end_days} days from now.")
             return []
             
-        game_list = []
-        for game in games[:15]: 
-            platforms = [p.get('platform', {}).get('name', '') for p in game.get('platforms') or []]
-            genres = [g.get('name', '') for g in game.get('genres') or []]
-            game_list.append({
-                "name": game.get('name', 'Unknown Game'),
-                "release_date": game.get('released', 'Unknown Date'),
-                "platforms": ", ".join(filter(None, platforms)),
-                "genres": ", ".join(filter(None, genres)),
-                "image_url": game.get('background_image', '')
-            })
-        return game_list
+        return [summarize_rawg_game(game) for game in games[:15]]
 
     except Exception as e:
         print(f"An error occurred while processing tentpole game releases: {e}")
@@ -316,85 +667,100 @@ def run_weekly_games_report(config):
     print("--- Starting Weekly Games Industry Report ---")
     
     # Setup services
-    creds = config['creds_account_1']
+    creds = config.creds
     gmail_service = build("gmail", "v1", credentials=creds)
-    genai_model = config['genai_model']
+    genai_model = config.genai_model
 
     # --- ### DATA FETCHING ### ---
-    print("--- Fetching Industry News & Market Analysis ---")
     core_analysis_feeds = ["https://www.gamesindustry.biz/feed", "https://www.gamedeveloper.com/rss.xml", "http://feeds.feedburner.com/venturebeat/games", "https://esportsinsider.com/feed", "https://investgame.net/feed/"]
     player_insight_feeds = ["https://www.pocketgamer.biz/rss/", "https://kotaku.com/rss", "http://feeds.feedburner.com/ign/all", "https://www.eurogamer.net/feed", "https://www.polygon.com/rss/index.xml", "https://www.vg247.com/feed", "https://www.gamespot.com/feeds/mashup", "https://www.pcgamer.com/rss/", "https://news.xbox.com/en-us/feed/", "https://mynintendonews.com/feed/", "https://store.steampowered.com/feeds/news.xml", "https://feeds.feedburner.com/psblog"]
-    
-    core_news_structured = deduplicate_articles(fetch_rss_feed_for_weekly(core_analysis_feeds))
-    player_news_structured = deduplicate_articles(fetch_rss_feed_for_weekly(player_insight_feeds))
-    
-    core_news_raw = "\n\n".join([f"Title: {article['title']}\nSummary: {article['summary']}" for article in core_news_structured])
-    player_news_raw = "\n\n".join([f"Title: {article['title']}\nSummary: {article['summary']}" for article in player_news_structured])
-    market_news_raw = core_news_raw + "\n\n---\n\n" + player_news_raw
-
-    print("--- Fetching Developer Learnings & Design ---")
     learning_feeds = ["https://www.gamedeveloper.com/rss.xml", "https://80.lv/articles/feed.xml", "https://howtomarketagame.com/feed/"]
-    learning_news_structured = deduplicate_articles(fetch_rss_feed_for_weekly(learning_feeds))
-    learning_news_raw = "\n\n".join([f"Title: {article['title']}\nSummary: {article['summary']}" for article in learning_news_structured])
-
     learning_youtube_channels = {"GDC": "UC0JB7TSe4MAgOdGSh5QZ2aQ", "Game Maker's Toolkit": "UCqJ-Xo29CKyLTB3A_p2qE6A", "AI and Games": "UCov_51F0betb6hJ6Gumxg3Q"}
-    all_videos = []
-    for name, channel_id in learning_youtube_channels.items():
-        all_videos.extend(fetch_youtube_channel_videos(config['YOUTUBE_API_KEY'], channel_id))
-    videos_for_prompt = "\n\n".join([f"Video Title: {v['title']}\nDescription: {v['description']}" for v in all_videos])
-
-    print("--- Fetching Technology & Tools Watch ---")
     engine_feeds = ["https://www.unrealengine.com/en-US/rss", "https://blog.unity.com/rss", "https://godotengine.org/rss.xml", "https://aras-p.info/atom.xml", "https://uploadvr.com/feed/", "https://www.roadtovr.com/feed/", "https://blogs.nvidia.com/blog/category/gaming/feed/"]
-    engine_news_structured = deduplicate_articles(fetch_rss_feed_for_weekly(engine_feeds))
-    engine_news_raw = "\n\n".join([f"Title: {article['title']}\nSummary: {article['summary']}" for article in engine_news_structured])
-
-    print("--- Fetching Community & Release Data ---")
     reddit_subreddits = ["gamedev", "truegamedev", "unity3d", "unrealengine", "godot", "GraphicsProgramming", "proceduralgeneration"]
-    reddit_raw = fetch_reddit_hot_posts(reddit_subreddits)
 
-    upcoming_releases_structured = fetch_upcoming_releases_from_rawg(config['RAWG_API_KEY'])
-    tentpole_releases_structured = fetch_tentpole_releases_from_rawg(config['RAWG_API_KEY'], start_days=31, end_days=180)
+    # All sources are independent, so fetch them concurrently and only wait once everything is in flight.
+    print("--- Fetching News, Videos, Community & Release Data ---")
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        jobs = {
+            'core': executor.submit(fetch_rss_feed_for_weekly, core_analysis_feeds),
+            'player': executor.submit(fetch_rss_feed_for_weekly, player_insight_feeds),
+            'learning': executor.submit(fetch_rss_feed_for_weekly, learning_feeds),
+            'engine': executor.submit(fetch_rss_feed_for_weekly, engine_feeds),
+            'reddit': executor.submit(fetch_reddit_hot_posts, reddit_subreddits),
+            'upcoming': executor.submit(fetch_upcoming_releases_from_rawg, config.rawg_api_key),
+            'tentpole': executor.submit(fetch_tentpole_releases_from_rawg, config.rawg_api_key, start_days=31, end_days=180),
+            'videos': executor.submit(fetch_youtube_channel_videos, config.youtube_api_key, list(learning_youtube_channels.values())),
+            'sender': executor.submit(get_sender_email, gmail_service),
+        }
+
+        news_groups = deduplicate_article_groups({
+            'core': jobs['core'].result(),
+            'learning': jobs['learning'].result(),
+            'player': jobs['player'].result(),
+            'engine': jobs['engine'].result(),
+        })
+        core_news_structured = news_groups['core']
+        player_news_structured = news_groups['player']
+        learning_news_structured = news_groups['learning']
+        engine_news_structured = news_groups['engine']
+        reddit_raw = jobs['reddit'].result()
+        upcoming_releases_structured = jobs['upcoming'].result()
+        tentpole_releases_structured = jobs['tentpole'].result()
+        all_videos = jobs['videos'].result()
+        try:
+            sender_email = jobs['sender'].result()
+        except HttpError as error:
+            print(f"Could not fetch the sender profile, will retry when sending. Error: {error}")
+            sender_email = None
+    save_feed_cache()
+
+    core_news_raw = "\n\n".join(f"Title: {article['title']}\nSummary: {article['summary']}" for article in core_news_structured)
+    player_news_raw = "\n\n".join(f"Title: {article['title']}\nSummary: {article['summary']}" for article in player_news_structured)
+    learning_news_raw = "\n\n".join(f"Title: {article['title']}\nSummary: {article['summary']}" for article in learning_news_structured)
+    videos_for_prompt = "\n\n".join(f"Video Title: {v['title']}\nDescription: {v['description']}" for v in all_videos)
+    engine_news_raw = "\n\n".join(f"Title: {article['title']}\nSummary: {article['summary']}" for article in engine_news_structured)
 
-    upcoming_for_prompt = "\n\n".join([f"Game: {g['name']}\nRelease Date: {g['release_date']}\nPlatforms: {g['platforms']}\nGenre: {g['genres']}" for g in upcoming_releases_structured])
-    tentpoles_for_prompt = "\n\n".join([f"Game: {g['name']}\nRelease Date: {g['release_date']}" for g in tentpole_releases_structured])
+    upcoming_for_prompt = "\n\n".join(f"Game: {g['name']}\nRelease Date: {g['release_date']}\nPlatforms: {g['platforms']}\nGenre: {g['genres']}" for g in upcoming_releases_structured)
+    tentpoles_for_prompt = "\n\n".join(f"Game: {g['name']}\nRelease Date: {g['release_date']}" for g in tentpole_releases_structured)
 
     # --- ### DEFINITIVE PROMPT (WITH HERO IMAGE SELECTION & FULL INSTRUCTIONS) ### ---
     prompt = f"""
     You are a senior games industry analyst. Your task is to provide the textual analysis for a weekly report (the last 7 days), following the specific instructions for each section.
 
+    The following source data is shared by several sections and is referred to by name in their instructions:
+    **CORE ANALYSIS DATA:**
+    {core_news_raw}
+    **PLAYER INSIGHT DATA:**
+    {player_news_raw}
+    **REDDIT DATA:**
+    {reddit_raw}
+
     # The State of Play: Weekly Games Industry Analysis
     
     ## Hero Image Prompt Generation
     **Instructions:** From the **CORE ANALYSIS DATA**, identify the top 2-3 most significant stories. Write a single, concise phrase (10-15 words) that artistically summarizes their core themes. This will be used to generate a piece of concept art. Example: "A shattered company logo, a glowing VR headset, and a triumphant indie character."
     ---
     ## This Week's Key Takeaways
-    **Instructions:** FIRST, review all the raw data provided below. Synthesize the entire week's news into 3-4 high-level bullet points that capture the most important overarching themes (e.g., major market trends, prevalent industry challenges, key technology shifts), end each point with an italicized line like '*_Why this matters:_*' that summarizes what this means for the industry as a whole.
+    **Instructions:** FIRST, review all the raw data provided in this prompt. Synthesize the entire week's news into 3-4 high-level bullet points that capture the most important overarching themes (e.g., major market trends, prevalent industry challenges, key technology shifts), end each point with an italicized line like '*_Why this matters:_*' that summarizes what this means for the industry as a whole.
     ---
     ## Top Stories & Market Analysis (The Signal)
-    **Instructions:** Using the **CORE ANALYSIS DATA**, identify the 5-6 most significant business events. Focus strictly on the strategic and financial implications (M&A, major strategy shifts, financial results). For each:
+    **Instructions:** Using the **CORE ANALYSIS DATA** above, identify the 5-6 most significant business events. Focus strictly on the strategic and financial implications (M&A, major strategy shifts, financial results). For each:
     1. Create an impactful, bolded headline.
     2. Write a paragraph explaining the event.
     3. Add an italicized line: '*_Why it Matters:_*' to provide your expert analysis. **Defer all player reaction and review summaries to the 'Community Pulse' section.**
     **Do not use a numbered list.**
-    **CORE ANALYSIS DATA:**
-    {core_news_raw}
     ---
     ## Funding & Investment Tracker (The Signal)
-    **Instructions:** From the **CORE ANALYSIS DATA**, identify 2-4 key funding announcements or acquisitions. For each, state the companies, deal size, and goals. Conclude with an italicized line: '*_The Takeaway:_*' analyzing the strategic rationale.
+    **Instructions:** From the **CORE ANALYSIS DATA** above, identify 2-4 key funding announcements or acquisitions. For each, state the companies, deal size, and goals. Conclude with an italicized line: '*_The Takeaway:_*' analyzing the strategic rationale.
     **Do not use a numbered list.**
-    **CORE ANALYSIS DATA:**
-    {core_news_raw}
     ---
     ## Community Pulse & Player Reception (The Noise)
-    **Instructions:** This section is crucial for understanding the player perspective. Using the **PLAYER INSIGHT DATA** and **REDDIT DATA**, synthesize the biggest trends in player communities this week. Do not repeat business news from the sections above; focus only on the player reaction to it.
+    **Instructions:** This section is crucial for understanding the player perspective. Using the **PLAYER INSIGHT DATA** and **REDDIT DATA** above, synthesize the biggest trends in player communities this week. Do not repeat business news from the sections above; focus only on the player reaction to it.
     - Identify 3-5 major themes. For each, create a bolded headline (e.g., **"Positive Reception for 'Game X' Launch,"** or **"Debate Over 'Game Y' Monetization"**).
     - Under each headline, summarize the general player sentiment. What are the common points of praise or criticism found in reviews and community threads?
     - Conclude each theme with an italicized line: '*_Developer Takeaway:_*' translating the player sentiment into a concrete lesson for developers.
     **Do not use a numbered list.**
-    **PLAYER INSIGHT DATA:**
-    {player_news_raw}
-    **REDDIT DATA:**
-    {reddit_raw}
     ---
     ## Insights for Developers
     **Instructions:** Review the provided articles and video descriptions. Extract 3-4 key design principles, post-mortem learnings, or innovative techniques. For each, use a bolded headline followed by a paragraph explaining the concept. End each point with an italicized line like '*_The Takeaway:_*' that summarizes the actionable advice for developers.
@@ -405,18 +771,14 @@ def run_weekly_games_report(config):
     {videos_for_prompt}
     ---
     ## Technology, Hardware and Tools Updates
-    **Instructions:** Review the provided engine news and Reddit data. Identify the 3-4 most important new tools, engine features, or emerging technologies. For each, use a bolded headline, explain what the technology does, and then add an italicized line like '*_Why it's exciting:_*' to explain the practical benefit for developers.
+    **Instructions:** Review the provided engine news and the **REDDIT DATA** above. Identify the 3-4 most important new tools, engine features, or emerging technologies. For each, use a bolded headline, explain what the technology does, and then add an italicized line like '*_Why it's exciting:_*' to explain the practical benefit for developers.
     **Do not use a numbered list.**
     **RAW ENGINE NEWS:**
     {engine_news_raw}
-    **RAW REDDIT DATA:**
-    {reddit_raw}
     ---
     ## New Game Announcements
-    **Instructions:** From the raw market news, identify any newly announced games upcoming in the next 6-48 months. Include the game name, platforms, and genre.
-    **RAW MARKET NEWS DATA:**
+    **Instructions:** From the **CORE ANALYSIS DATA** and **PLAYER INSIGHT DATA** above, identify any newly announced games upcoming in the next 6-48 months. Include the game name, platforms, and genre.
     **Do not use a numbered list.**
-    {market_news_raw}
     ---
     ## Upcoming Releases (Next 30 days)
     **Instructions:** Review the list of upcoming game releases. Present them in a simple, chronological list including name, release date, genre(s), and platforms.
@@ -434,42 +796,65 @@ def run_weekly_games_report(config):
 
     # --- ### AI SYNTHESIS ### ---
     print("--- Synthesizing Weekly Report Text ---")
+    gcs_bucket_name = "weekly-report-hero-images-keen-life-464422-t0" 
+    hero_executor = ThreadPoolExecutor(max_workers=1)
+    hero_future = None
+
+    def start_hero_image(image_prompt_text):
+        return hero_executor.submit(
+            generate_hero_image,
+            project_id=config.project_id, 
+            location="us-central1", 
+            gcs_bucket_name=gcs_bucket_name,
+            prompt_text=image_prompt_text
+        )
+
+    # Section title -> (Markdown body, rendered HTML), filled in as each section finishes streaming.
+    rendered_sections = {}
+
     try:
-        response = genai_model.generate_content(prompt)
-        report_text = response.text
+        # Stream the report so the hero image and the section HTML are produced while the rest of the text is still being written.
+        report_chunks = []
+        heading_open = False
+        for chunk in generate_content_with_backoff(genai_model, prompt, stream=True):
+            # chunk.text raises ValueError for chunks without text parts (e.g. a final chunk carrying only the finish reason).
+            try:
+                text = chunk.text
+            except ValueError:
+                continue
+            report_chunks.append(text)
+            # A section only completes once the next '## ' heading line has fully arrived, so re-scan only on chunks
+            # containing a '#' or the newline that ends a heading started in an earlier chunk.
+            if '#' in text:
+                heading_open = '\n' not in text[text.rfind('#'):]
+            elif heading_open and '\n' in text:
+                heading_open = False
+            else:
+                continue
+            completed_sections = split_report_sections("".join(report_chunks), complete_only=True)
+            if hero_future is None and completed_sections.get("Hero Image Prompt Generation"):
+                hero_future = start_hero_image(completed_sections["Hero Image Prompt Generation"])
+            for title, body in completed_sections.items():
+                if title not in rendered_sections:
+                    rendered_sections[title] = (body, MD.reset().convert(body))
+        report_text = "".join(report_chunks)
+        if not report_text.strip(): raise ValueError("The model returned no report text.")
     except Exception as e:
         report_text = f"An error occurred during AI synthesis: {e}"
         print(f"FATAL: AI Synthesis failed. Aborting. Error: {e}")
+        hero_executor.shutdown(wait=False, cancel_futures=True)
         return
 
     # --- ### POST-AI ASSEMBLY & HTML GENERATION ### ---
     print("\n--- Assembling Final Email with Generated Hero Image ---")
     
-    report_sections = {}
-    # CORRECTED: This list now correctly includes all 10 sections from the prompt
-    section_titles = [
-        "Hero Image Prompt Generation", "This Week's Key Takeaways", "Top Stories & Market Analysis (The Signal)", "Funding & Investment Tracker (The Signal)",
-        "Community Pulse & Player Reception (The Noise)", "Insights for Developers", 
-        "Technology, Hardware and Tools Updates", "New Game Announcements", "Upcoming Releases (Next 30 days)", 
-        "Tentpole Releases (1+ Months)"
-    ]
-    split_text = report_text.split('---')
-    for i, block in enumerate(split_text):
-        if i < len(section_titles):
-            content = re.sub(r'^\s*#+\s*.*?\n', '', block, count=1).strip()
-            report_sections[section_titles[i]] = content
-
-    # --- Generate the Hero Image ---
-    image_prompt_text = report_sections.get("Hero Image Prompt Generation", "general video game industry news")
-    
-    gcs_bucket_name = "weekly-report-hero-images-keen-life-464422-t0" 
-    
-    hero_img_1 = generate_hero_image(
-        project_id=config['project_id'], 
-        location="us-central1", 
-        gcs_bucket_name=gcs_bucket_name,
-        prompt_text=image_prompt_text
-    )
+    report_sections = split_report_sections(report_text)
+
+    # --- Generate the Hero Image (unless it was already started during streaming) ---
+    if hero_future is None:
+        hero_future = start_hero_image(report_sections.get("Hero Image Prompt Generation", "general video game industry news"))
+    hero_executor.shutdown(wait=False)
+    hero_img_1 = hero_future.result()
 
     # --- Build the Hero Image HTML Block ---
     placeholder_image = "https://storage.googleapis.com/gemini-generative-ai-python-static/placeholder.png"
@@ -480,7 +865,8 @@ def run_weekly_games_report(config):
     
     # Get game object for tentpole release
     tentpole_analysis_text = report_sections.get("Tentpole Releases (1+ Months)", "")
-    tentpole_hero_game = next((game for game in tentpole_releases_structured if game['name'] in tentpole_analysis_text), None)
+    mentioned_tentpole_games = find_mentioned_games(tentpole_releases_structured, tentpole_analysis_text)
+    tentpole_hero_game = mentioned_tentpole_games[0] if mentioned_tentpole_games else None
     hero_img_3 = tentpole_hero_game['image_url'] if tentpole_hero_game and tentpole_hero_game.get('image_url') else placeholder_image
 
     # This HTML now includes captions
@@ -504,18 +890,18 @@ def run_weekly_games_report(config):
     """
 
     # --- (The rest of the assembly logic is the same) ---
-    tentpole_html_images = ""
-    for game in tentpole_releases_structured:
-        if game['name'] in tentpole_analysis_text:
-            tentpole_html_images += f"""
-            <div style="margin-bottom: 25px; padding-bottom: 15px; border-bottom: 1px solid #eee;">
-                <img src="{game['image_url']}" alt="Cover art for {game['name']}" style="width:100%; height:auto; border-radius: 8px; margin-bottom: 12px;">
-                <h3 style="margin: 0 0 5px 0; font-size: 18px;">{game['name']}</h3>
-                <p style="margin: 0 0 4px 0;"><strong>Release Date:</strong> {game['release_date']}</p>
-                <p style="margin: 0 0 4px 0;"><strong>Platforms:</strong> {game['platforms']}</p>
-                <p style="margin: 0;"><strong>Genre:</strong> {game['genres']}</p>
-            </div>
-            """
+    tentpole_html_parts = []
+    for game in mentioned_tentpole_games:
+        tentpole_html_parts.append(f"""
+        <div style="margin-bottom: 25px; padding-bottom: 15px; border-bottom: 1px solid #eee;">
+            <img src="{game['image_url']}" alt="Cover art for {game['name']}" style="width:100%; height:auto; border-radius: 8px; margin-bottom: 12px;">
+            <h3 style="margin: 0 0 5px 0; font-size: 18px;">{game['name']}</h3>
+            <p style="margin: 0 0 4px 0;"><strong>Release Date:</strong> {game['release_date']}</p>
+            <p style="margin: 0 0 4px 0;"><strong>Platforms:</strong> {game['platforms']}</p>
+            <p style="margin: 0;"><strong>Genre:</strong> {game['genres']}</p>
+        </div>
+        """)
+    tentpole_html_images = "".join(tentpole_html_parts)
 
     sources_map = {
         "Top Stories & Funding/Investment": core_analysis_feeds,
@@ -531,46 +917,18 @@ def run_weekly_games_report(config):
     today_str = datetime.date.today().strftime("%B %d, %Y")
     email_subject = f"Your Weekly Games Industry Report: {today_str}"
 
-    for key, value in report_sections.items():
-        report_sections[key] = markdown.markdown(value, extensions=['extra'])
-    
-    final_html_content = f"""
-        <h1>{email_subject}</h1>
-        {hero_image_html}
-        <h2>This Week's Key Takeaways</h2>
-        {report_sections.get("This Week's Key Takeaways", "")}
-        <h2>Top Stories & Market Analysis (The Signal)</h2>
-        {report_sections.get("Top Stories & Market Analysis (The Signal)", "")}
-        <h2>Funding & Investment Tracker (The Signal)</h2>
-        {report_sections.get("Funding & Investment Tracker (The Signal)", "")}
-        <h2>Community Pulse & Player Reception</h2>
-        {report_sections.get('Community Pulse & Player Reception (The "Noise" as Insight)', "")}
-        <h2>Insights for Developers</h2>
-        {report_sections.get("Insights for Developers", "")}
-        <h2>Technology, Hardware and Tools Updates</h2>
-        {report_sections.get("Technology, Hardware and Tools Updates", "")}
-        <h2>New Game Announcements</h2>
-        {report_sections.get("New Game Announcements", "")}
-        <h2>Upcoming Releases (Next 30 days)</h2>
-        {report_sections.get("Upcoming Releases (Next 30 days)", "")}
-        <h2>Tentpole Releases (1+ Months)</h2>
-        {tentpole_html_images}
-        {report_sections.get("Tentpole Releases (1+ Months)", "")}
-        <hr>
-        {markdown.markdown(sources_markdown)}
-    """
-        
-    html_body = f"""
-    <html><head><style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: auto; padding: 20px; }}
-        h1, h2, h3 {{ font-weight: 500; color: #111; }} h1 {{ font-size: 24px; }}
-        h2 {{ font-size: 20px; border-bottom: 1px solid #eee; padding-bottom: 5px; margin-top: 30px; }}
-        h3 {{font-size: 16px;}}
-    </style></head><body>
-        {final_html_content}
-    </body></html>
-    """
-    send_email(gmail_service, email_subject, html_body, config['RECIPIENT_EMAIL'])
+    html_parts = [EMAIL_HTML_HEAD, f"<h1>{email_subject}</h1>", hero_image_html]
+    for heading, section_title in EMAIL_SECTIONS:
+        html_parts.append(f"<h2>{heading}</h2>")
+        if section_title == "Tentpole Releases (1+ Months)": html_parts.append(tentpole_html_images)
+        body = report_sections.get(section_title, "")
+        rendered_body, rendered_html = rendered_sections.get(section_title, (None, None))
+        html_parts.append(rendered_html if rendered_body == body else MD.reset().convert(body))
+    html_parts += ["<hr>", MD.reset().convert(sources_markdown), EMAIL_HTML_TAIL]
+    html_body = "\n".join(html_parts)
+
+    send_email(gmail_service, email_subject, html_body, config.recipient_email, sender_email=sender_email)
+    save_credentials(creds)
     
     print("Weekly games report finished successfully.")
 
@@ -582,20 +940,24 @@ if __name__ == "__main__":
     _, project_id = google_auth_default()
     if not project_id: raise RuntimeError("Could not determine Google Cloud Project ID.")
 
-    config = {
-        "project_id": project_id,
-        "GEMINI_API_KEY": get_secret("GEMINI_API_KEY", project_id),
-        "OAUTH_TOKEN_JSON": get_secret("OAUTH_TOKEN_JSON", project_id),
-        "YOUTUBE_API_KEY": get_secret("YOUTUBE_API_KEY", project_id),
-        "RAWG_API_KEY": get_secret("RAWG_API_KEY", project_id),
-        "RECIPIENT_EMAIL": get_secret("RECIPIENT_EMAIL_WEEKLY", project_id),
-    }
-
-    genai.configure(api_key=config['GEMINI_API_KEY'])
-    config['genai_model'] = genai.GenerativeModel('gemini-2.5-flash')
-    
-    token_info_1 = json.loads(config['OAUTH_TOKEN_JSON'])
-    config['creds_account_1'] = Credentials.from_authorized_user_info(token_info_1, SCOPES)
+    # The secrets are independent, so fetch them concurrently.
+    secret_ids = ["GEMINI_API_KEY", "OAUTH_TOKEN_JSON", "YOUTUBE_API_KEY", "RAWG_API_KEY", "RECIPIENT_EMAIL_WEEKLY"]
+    get_secret_client() # Create the shared client up front so the worker threads don't each build one.
+    with ThreadPoolExecutor(max_workers=len(secret_ids) + 1) as executor:
+        # Import the Gemini SDK while the secret RPCs are in flight.
+        genai_import = executor.submit(importlib.import_module, "google.generativeai")
+        secrets = dict(zip(secret_ids, executor.map(lambda secret_id: get_secret(secret_id, project_id), secret_ids)))
+        genai = genai_import.result()
+
+    genai.configure(api_key=secrets['GEMINI_API_KEY'])
+    config = ReportConfig(
+        project_id=project_id,
+        youtube_api_key=secrets['YOUTUBE_API_KEY'],
+        rawg_api_key=secrets['RAWG_API_KEY'],
+        recipient_email=secrets['RECIPIENT_EMAIL_WEEKLY'],
+        genai_model=genai.GenerativeModel('gemini-2.5-flash'),
+        creds=load_credentials(secrets['OAUTH_TOKEN_JSON']),
+    )
     
     run_weekly_games_report(config)
     print("Script finished successfully.")
\ No newline at end of file